@@ -343,7 +343,7 @@ def run_anonymization(conf, resdir):
             gender_data_new = []
 
             for author in gender_data:
-                if author[0] in author_to_anonymized_author_gender.keys():
+                if author[0] in author_to_anonymized_author_gender:
                     new_person = author_to_anonymized_author_gender[author[0]]
                     author[0] = new_person[0]
                     gender_data_new.append(author)
@@ -22,18 +22,54 @@ This file provides the needed functions for standardized CSV writing
 
 import csv
 
+# size of the write buffer for output files (1 MiB), to reduce the number of write calls for large outputs
+__buffer_size = 1 << 20
+
 
 def __encode(line):
     """Encode the given line (a tuple of columns) properly in UTF-8."""
 
-    lineres = ()  # re-encode column if it is unicode
-    for column in line:
-        if type(column) is unicode:
-            lineres += (column.encode("utf-8"),)
-        else:
-            lineres += (column,)
+    # re-encode column if it is unicode; build the new tuple at once instead of concatenating it column by column
+    return tuple(column.encode("utf-8") if type(column) is unicode else column for column in line)
+
+
+def open_csv_file(file_path, append=False):
+    """
+    Open the file with the given file path for writing lines to it, using a large write buffer.
+    The returned file object has to be closed by the caller (e.g., by using a "with" statement).
+
+    :param file_path: The path where the file shall be written
+    :param append: Flag if lines shall be appended to file or overwrite file
+    :return: the opened file object
+    """
+
+    open_mode = "a+b" if append else "wb"
+    return open(file_path, open_mode, __buffer_size)
+
 
-    return lineres
+def create_writer(csv_file):
+    """
+    Create a CSV writer for the given opened file (see function "open_csv_file").
+    The writer can be used for several calls of "write_lines" on the same file.
+
+    :param csv_file: The opened file to write lines to
+    :return: the CSV writer for the file
+    """
+
+    return csv.writer(csv_file, delimiter=';', lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
+
+
+def write_lines(wr, lines):
+    """
+    Write the given lines using the given CSV writer (see function "create_writer").
+
+    :param wr: The CSV writer to write the lines with
+    :param lines: The lines that shall be written in the file; can be any iterable (e.g., a generator),
+                  the lines are written to the file one by one while iterating over it
+    """
+
+    # encode in proper UTF-8 before writing to file
+    wr.writerows(__encode(line) for line in lines)
 
 
 def write_to_csv(file_path, lines, append=False):
@@ -41,18 +77,14 @@ def write_to_csv(file_path, lines, append=False):
     Write the given lines to the file with the given file path.
 
     :param file_path: The path where the file shall be written
-    :param lines: The lines that shall be written in the file
+    :param lines: The lines that shall be written in the file; can be any iterable (e.g., a generator),
+                  the lines are written to the file one by one while iterating over it
     :param append: Flag if lines shall be appended to file or overwrite file
     """
 
-    open_mode = "a+b" if append else "wb"
+    with open_csv_file(file_path, append) as csv_file:
+        write_lines(create_writer(csv_file), lines)
 
-    with open(file_path, open_mode) as csv_file:
-        wr = csv.writer(csv_file, delimiter=';', lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC)
-        # encode in proper UTF-8 before writing to file
-        for line in lines:
-            line_encoded = __encode(line)
-            wr.writerow(line_encoded)
 
 def read_from_csv(file_path, delimiter=";"):
     """
@@ -0,0 +1,126 @@
+# coding=utf-8
+# This file is part of codeface-extraction, which is free software: you
+# can redistribute it and/or modify it under the terms of the GNU General
+# Public License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+This file provides the needed functions for passing users to Codeface's ID service
+"""
+
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+from codeface.cli import log
+from codeface.cluster.idManager import idManager
+
+# number of parallel connections to the ID service when passing the users to it
+id_service_connections = 8
+
+
+def get_user_string(name, email):
+    """
+    Construct the string of the given user as passed to the ID service.
+
+    :param name: the name of the user
+    :param email: the e-mail address of the user (may be empty)
+    :return: the user string
+    """
+
+    if not email or email is None:
+        return "{name}".format(name=name)
+        # return "{name} <{name}@default.com>".format(name=name)  # for debugging only
+    else:
+        return "{name} <{email}>".format(name=name, email=email)
+
+
+def group_user_strings(user_strings, user_parts):
+    """
+    Group the given user strings by the persons they may belong to.
+    The ID service identifies persons by their names and e-mail addresses, so user strings sharing
+    a name or an e-mail address (transitively) are put into the same group.
+
+    :param user_strings: the user strings to group
+    :param user_parts: the name and e-mail address of each of the user strings (key: user string)
+    :return: the list of groups (lists of user strings), keeping the order of the given user strings
+             within and across the groups
+    """
+
+    parents = dict()
+
+    def find(key):
+        while parents.setdefault(key, key) != key:
+            key = parents[key]
+        return key
+
+    for user_string in user_strings:
+        name, mail = user_parts[user_string]
+        root = find(("name", name.lower()))
+        if mail:
+            parents[find(("email", mail.lower()))] = root
+
+    groups = OrderedDict()
+    for user_string in user_strings:
+        root = find(("name", user_parts[user_string][0].lower()))
+        groups.setdefault(root, []).append(user_string)
+
+    return groups.values()
+
+
+def get_ids_from_user_strings(user_strings, user_parts, buffer_db_ids, idservice, dbm, conf):
+    """
+    Pass the given user strings to the ID service and add their person ids to the given buffer.
+    The user strings are passed in the order of their first occurrence, as the ID service stores the name and
+    e-mail address of the first user string passed for a person.
+
+    :param user_strings: the user strings to pass to the ID service
+    :param user_parts: the name and e-mail address of each of the user strings (key: user string)
+    :param buffer_db_ids: the buffer of person ids (key: user string); user strings in it are not passed again
+    :param idservice: the ID-service connection to use
+    :param dbm: the database connection to open further ID-service connections with
+    :param conf: the project configuration to open further ID-service connections with
+    """
+
+    # only pass the users which are not in the buffer yet
+    user_strings = [user_string for user_string in OrderedDict.fromkeys(user_strings)
+                    if user_string not in buffer_db_ids]
+    if not user_strings:
+        return
+
+    # pass the users to the ID service via several connections in parallel to overlap the round trips;
+    # user strings of the same group are passed via the same connection one after another, as the
+    # ID service could otherwise create several persons for them when they are passed at the same time
+    groups = group_user_strings(user_strings, user_parts)
+    num_connections = max(1, min(id_service_connections, len(groups)))
+    services = [idservice] + [idManager(dbm, conf) for _ in range(num_connections - 1)]
+    chunks = [[] for _ in services]
+    for i, group in enumerate(groups):
+        chunks[i % num_connections].extend(group)
+
+    def get_ids(service_and_chunk):
+        (service, chunk) = service_and_chunk
+        ids = []
+        for user_string in chunk:
+            # get person information from ID service
+            log.devinfo("Passing user '{}' to ID service.".format(user_string))
+            ids.append((user_string, service.getPersonID(user_string)))
+        return ids
+
+    pool = ThreadPool(num_connections)
+    try:
+        results = pool.map(get_ids, zip(services, chunks))
+    finally:
+        pool.close()
+        pool.join()
+
+    # add user information to buffer
+    for ids in results:
+        for (user_string, idx) in ids:
+            buffer_db_ids[user_string] = idx
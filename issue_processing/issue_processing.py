@@ -24,11 +24,10 @@ This file is able to extract Github issue data from json files.
 """
 
 import argparse
-import httplib
 import json
 import os
 import sys
-import urllib
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
 import operator
@@ -39,6 +38,7 @@ from codeface.dbmanager import DBManager
 from dateutil import parser as dateparser
 
 from csv_writer import csv_writer
+from id_service import id_service
 
 # known types from JIRA and GitHub default labels
 known_types = {"bug", "improvement", "enhancement", "new feature", "task", "test", "wish"}
@@ -52,6 +52,12 @@ known_resolutions = {"unresolved", "fixed", "wontfix", "duplicate", "invalid", "
 # datetime format string
 datetime_format = "%Y-%m-%d %H:%M:%S"
 
+# buffer for already formatted times (key: time as given by GitHub), as the same times occur repeatedly
+formatted_times = dict()
+
+# JSON representation of the (always empty) components of GitHub issues
+empty_components_json = json.dumps([])
+
 def run():
     # get all needed paths and arguments for the method call.
     parser = argparse.ArgumentParser(prog='codeface-extraction-issues-github', description='Codeface extraction')
@@ -119,9 +125,15 @@ def format_time(time):
     # empty time would be formatted to current date
     if time == "" or time is None:
         return ""
-    else:
-        d = dateparser.parse(time)
-        return d.strftime(datetime_format)
+
+    # check buffer to avoid parsing the same time repeatedly
+    if time in formatted_times:
+        return formatted_times[time]
+
+    d = dateparser.parse(time)
+    formatted_time = d.strftime(datetime_format)
+    formatted_times[time] = formatted_time
+    return formatted_time
 
 
 def subtract_seconds_from_time(time, seconds):
@@ -210,7 +222,7 @@ def update_user_dict(user_dict, user):
     if user is None:
         user = create_deleted_user()
 
-    if not user["username"] in user_dict.keys():
+    if not user["username"] in user_dict:
         if not user["username"] is None and not user["username"] == "":
             user_dict[user["username"]] = user
     else:
@@ -340,7 +352,7 @@ def merge_issue_events(issue_data):
 
             # as we cannot update the referenced issue during iterating over all issues, we need to save the
             # referenced_by event for the referenced issue temporarily
-            if rel_issue["number"] in issue_data_to_update.keys():
+            if rel_issue["number"] in issue_data_to_update:
                 issue_data_to_update[rel_issue["number"]]["eventsList"].append(referenced_issue_event)
             else:
                 ref = dict()
@@ -446,21 +458,15 @@ def merge_issue_events(issue_data):
             if "event_info_2" not in event:
                 event["event_info_2"] = ""
 
-            # if event collides with a comment
-            if event["created_at"] in comments:
-                comment = comments[event["created_at"]]
-                # if someone gets mentioned or subscribed by someone else in a comment,
-                # re-write the reference
-                if (event["event"] == "mentioned" or event["event"] == "subscribed") and \
-                                comment["event"] == "commented":
-                    event["ref_target"] = event["user"]
-                    event["user"] = comment["user"]
-            elif subtract_seconds_from_time(event["created_at"], 1) in comments:
-                comment = comments[subtract_seconds_from_time(event["created_at"], 1)]
-                # if someone gets mentioned or subscribed by someone else in a comment,
-                # re-write the reference
-                if (event["event"] == "mentioned" or event["event"] == "subscribed") and \
-                                comment["event"] == "commented":
+            # if someone gets mentioned or subscribed by someone else in a comment, re-write the reference;
+            # only these events are affected, so only look up colliding comments for them
+            # (as computing the time one second before the event is expensive)
+            if event["event"] == "mentioned" or event["event"] == "subscribed":
+                # if event collides with a comment
+                comment = comments.get(event["created_at"])
+                if comment is None:
+                    comment = comments.get(subtract_seconds_from_time(event["created_at"], 1))
+                if comment is not None and comment["event"] == "commented":
                     event["ref_target"] = event["user"]
                     event["user"] = comment["user"]
 
@@ -500,10 +506,13 @@ def merge_issue_events(issue_data):
         issue["eventsList"] = sorted(issue["eventsList"], key=lambda k: k["created_at"])
 
     # updates all the issues by the temporarily stored referenced_by events
+    # (index the issues by their numbers once instead of searching all issues for every referenced issue)
+    issues_by_number = dict()
+    for issue in issue_data:
+        issues_by_number.setdefault(issue["number"], []).append(issue)
     for key, value in issue_data_to_update.iteritems():
-        for issue in issue_data:
-            if issue["number"] == value["number"]:
-                issue["eventsList"] = issue["eventsList"] + value["eventsList"]
+        for issue in issues_by_number.get(value["number"], []):
+            issue["eventsList"] = issue["eventsList"] + value["eventsList"]
 
     return issue_data
 
@@ -541,7 +550,8 @@ def reformat_events(issue_data):
     # as the user dictionary is created, start re-formating the event information of all issues
     for issue in issue_data:
 
-        events_to_remove = list()
+        # ids of the events to remove (the events themselves are kept alive by the eventsList meanwhile)
+        events_to_remove = set()
 
         # re-format information of every event in the eventsList of an issue
         for event in issue["eventsList"]:
@@ -639,14 +649,12 @@ def reformat_events(issue_data):
             elif event["event"] == "referenced" and not event["commit"] is None:
                 # remove "referenced" events originating from commits
                 # as they are handled as referenced commit
-                events_to_remove.append(event)
+                events_to_remove.add(id(event))
 
-        # sorts eventsList by time again
-        issue["eventsList"] = sorted(issue["eventsList"], key=lambda k: k["created_at"])
-
-        # remove unwanted events
-        for event_to_remove in events_to_remove:
-            issue["eventsList"].remove(event_to_remove)
+        # remove unwanted events and sort eventsList by time again, filtering the list in a single pass
+        # instead of removing every unwanted event separately from it
+        issue["eventsList"] = sorted((event for event in issue["eventsList"] if id(event) not in events_to_remove),
+                                     key=lambda k: k["created_at"])
 
     return issue_data
 
@@ -668,59 +676,54 @@ def insert_user_data(issues, conf, resdir):
     user_buffer = dict()
     # create buffer for user ids (key: user string)
     user_id_buffer = dict()
-    # create buffer for usernames (key: username)
-    username_id_buffer = dict()
+    # create buffer for usernames (key: username, value: user string)
+    username_string_buffer = dict()
+    # create buffer for user strings (key: tuple of username, name, and e-mail address of the user as given)
+    user_string_buffer = dict()
+    # create buffer for the name and e-mail address of user strings (key: user string),
+    # keeping the user strings in the order of their first occurrence
+    user_parts_buffer = OrderedDict()
     # open database connection
     dbm = DBManager(conf)
     # open ID-service connection
     idservice = idManager(dbm, conf)
 
-    def get_user_string(name, email):
-        if not email or email is None:
-            return "{name}".format(name=name)
-            # return "{name} <{name}@default.com>".format(name=name)  # for debugging only
+    def get_user_string_of_user(user, buffer_users=user_string_buffer, buffer_parts=user_parts_buffer,
+                                buffer_usernames=username_string_buffer):
+        # the same users occur in many issues and events, so check the buffer
+        # before encoding the user and constructing its user string
+        key = (user["username"], user["name"], user["email"])
+        if key in buffer_users:
+            user_string, username = buffer_users[key]
         else:
-            return "{name} <{email}>".format(name=name, email=email)
+            username = unicode(user["username"]).encode("utf-8")
 
-    def get_id_and_update_user(user, buffer_db_ids=user_id_buffer, buffer_usernames=username_id_buffer):
-        username = unicode(user["username"]).encode("utf-8")
-
-        # fix encoding for name and e-mail address
-        if user["name"] is not None:
-            name = unicode(user["name"]).encode("utf-8")
-        else:
-            name = username
-        mail = unicode(user["email"]).encode("utf-8")
-        # construct string for ID service and send query
-        user_string = get_user_string(name, mail)
-
-        # check buffer to reduce amount of DB queries
-        if user_string in buffer_db_ids:
-            log.devinfo("Returning person id for user '{}' from buffer.".format(user_string))
-            if username is not None:
-                buffer_usernames[username] = buffer_db_ids[user_string]
-            return buffer_db_ids[user_string]
+            # fix encoding for name and e-mail address
+            if user["name"] is not None:
+                name = unicode(user["name"]).encode("utf-8")
+            else:
+                name = username
+            mail = unicode(user["email"]).encode("utf-8")
+            # construct string for ID service
+            user_string = id_service.get_user_string(name, mail)
 
-        # get person information from ID service
-        log.devinfo("Passing user '{}' to ID service.".format(user_string))
-        idx = idservice.getPersonID(user_string)
+            # add user string to buffer
+            buffer_users[key] = (user_string, username)
+            buffer_parts[user_string] = (name, mail)
 
-        # add user information to buffer
-        # user_string = get_user_string(user["name"], user["email"]) # update for
-        buffer_db_ids[user_string] = idx
-
-        # add id to username buffer
+        # add user string to username buffer
         if username is not None:
-            buffer_usernames[username] = idx
+            buffer_usernames[username] = user_string
 
-        return idx
+        return user_string
 
     def get_user_from_id(idx, buffer_db=user_buffer):
 
-        # check whether user information is in buffer to reduce amount of DB queries
-        if idx in buffer_db:
-            log.devinfo("Returning user '{}' from buffer.".format(idx))
-            return buffer_db[idx]
+        # check whether user information is in buffer to reduce amount of DB queries;
+        # this is done for every single user occurrence, so buffer hits are not logged
+        user = buffer_db.get(idx)
+        if user is not None:
+            return user
 
         # get person information from ID service
         log.devinfo("Passing user id '{}' to ID service.".format(idx))
@@ -736,38 +739,42 @@ def insert_user_data(issues, conf, resdir):
         return user
 
 
-    # check and update database for all occurring users
+    # construct the user strings for all occurring users
     for issue in issues:
-        # check database for issue author
-        issue["user"] = get_id_and_update_user(issue["user"])
+        # issue author
+        issue["user"] = get_user_string_of_user(issue["user"])
 
-        # check database for event authors
+        # event authors
         for event in issue["eventsList"]:
-            event["user"] = get_id_and_update_user(event["user"])
+            event["user"] = get_user_string_of_user(event["user"])
 
-            # check database for the reference-target user if needed
+            # the reference-target user if needed
             if event["ref_target"] != "":
-                event["ref_target"] = get_id_and_update_user(event["ref_target"])
+                event["ref_target"] = get_user_string_of_user(event["ref_target"])
+
+    # check and update database for all occurring users
+    id_service.get_ids_from_user_strings(user_parts_buffer.keys(), user_parts_buffer, user_id_buffer,
+                                         idservice, dbm, conf)
 
     # get all users after database updates having been performed
     for issue in issues:
         # get issue author
-        issue["user"] = get_user_from_id(issue["user"])
+        issue["user"] = get_user_from_id(user_id_buffer[issue["user"]])
 
         # get event authors
         for event in issue["eventsList"]:
-            event["user"] = get_user_from_id(event["user"])
+            event["user"] = get_user_from_id(user_id_buffer[event["user"]])
 
             # get the reference-target user if needed
             if event["ref_target"] != "":
-                event["ref_target"] = get_user_from_id(event["ref_target"])
+                event["ref_target"] = get_user_from_id(user_id_buffer[event["ref_target"]])
                 event["event_info_1"] = event["ref_target"]["name"]
                 event["event_info_2"] = event["ref_target"]["email"]
 
     # dump username, name, and e-mail to file
     lines = []
-    for username in username_id_buffer:
-        user = get_user_from_id(username_id_buffer[username])
+    for username in username_string_buffer:
+        user = get_user_from_id(user_id_buffer[username_string_buffer[username]])
         lines.append((
             username,
             user["name"],
@@ -793,26 +800,44 @@ def print_to_disk(issues, results_folder):
     output_file = os.path.join(results_folder, "issues-github.list")
     log.info("Dumping output in file '{}'...".format(output_file))
 
-    # construct lines of output
-    lines = []
-    for issue in issues:
-        for event in issue["eventsList"]:
-            lines.append((
-                issue["number"],
-                issue["title"],
-                json.dumps(issue["type"]),
-                issue["state_new"],
-                json.dumps(issue["resolution"]),
-                issue["created_at"],
-                issue["closed_at"],
-                json.dumps([]),  # components
-                event["event"],
-                event["user"]["name"],
-                event["user"]["email"],
-                event["created_at"],
-                event["event_info_1"],
-                json.dumps(event["event_info_2"])
-            ))
-
-    # write to output file
-    csv_writer.write_to_csv(output_file, sorted(set(lines), key=lambda line: lines.index(line)))
+    def get_unique_lines():
+        # construct lines of output lazily, skipping duplicate lines (keeping the first occurrence of each line)
+        written_lines = set()
+        for issue in issues:
+            for line in get_issue_lines(issue):
+                if line not in written_lines:
+                    written_lines.add(line)
+                    yield line
+
+    # stream the lines to the output file
+    csv_writer.write_to_csv(output_file, get_unique_lines())
+
+
+def get_issue_lines(issue):
+    """
+    Construct the output lines for all events of the given issue.
+
+    :param issue: the issue to construct the output lines for
+    :return: a generator yielding the output lines (tuples of columns) of the issue
+    """
+
+    # the issue columns are the same for all events of the issue, so construct and encode them only once
+    issue_columns = (
+        issue["number"],
+        issue["title"],
+        json.dumps(issue["type"]),
+        issue["state_new"],
+        json.dumps(issue["resolution"]),
+        issue["created_at"],
+        issue["closed_at"],
+        empty_components_json  # components
+    )
+    for event in issue["eventsList"]:
+        yield issue_columns + (
+            event["event"],
+            event["user"]["name"],
+            event["user"]["email"],
+            event["created_at"],
+            event["event_info_1"],
+            json.dumps(event["event_info_2"])
+        )
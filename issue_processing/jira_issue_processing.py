@@ -24,13 +24,14 @@ This file is able to extract Jira issue data from xml files.
 """
 
 import argparse
+import multiprocessing
 import os
 import sys
 import time
 import csv
 import json
 
-from xml.dom.minidom import parse
+from collections import OrderedDict, namedtuple
 from datetime import datetime
 from dateutil import parser as dateparser
 
@@ -40,11 +41,19 @@ from codeface.configuration import Configuration
 from codeface.dbmanager import DBManager
 
 from csv_writer import csv_writer
+from id_service import id_service
 
 from jira import JIRA
 from jira.exceptions import JIRAError
+from joblib import Parallel, delayed
 from time import sleep
 
+try:
+    from lxml import etree
+except ImportError:
+    # fall back to the C implementation of ElementTree of the standard library if lxml is not installed
+    import xml.etree.cElementTree as etree
+
 reload(sys)
 sys.setdefaultencoding("utf-8")
 
@@ -52,6 +61,37 @@ sys.setdefaultencoding("utf-8")
 jira_request_counter = 0
 max_requests = 45000 # 50,000 JIRA requests per 24 hours are allowed
 
+# maximum number of user ids to query from the database at once
+user_query_size = 1000
+
+# datetime format string
+datetime_format = "%Y-%m-%d %H:%M:%S"
+
+# month numbers of the abbreviated month names used in RFC 2822 times (as used in the Jira XML files)
+month_numbers = {"Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+                 "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12}
+
+# buffer for already formatted times (key: time as given by Jira), as the same times occur repeatedly
+formatted_times = dict()
+
+# buffer for the values which take only a few distinct values across all issues (e.g., types, states,
+# and components), so that the issues share the same string objects instead of holding copies of them;
+# as the xml files are parsed in separate processes, the values are interned again when merging the issues
+interned_values = dict()
+
+# user object as created while parsing the issues (a tuple instead of a dict, as there are lots of them)
+User = namedtuple("User", ["name", "username", "email"])
+
+# mapping of Jira resolutions to the corresponding default GitHub labels (for consistency)
+resolution_mapping = {"won't fix": "wontfix", "won't do": "wontdo"}
+
+# JSON encoder for the short lists written to the output files, created once for all rows
+# (produces the same output as "json.dumps" with default arguments)
+json_encoder = json.JSONEncoder()
+
+# JSON representation of the default resolution of an issue when created
+default_resolution_json = json_encoder.encode(["unresolved"])
+
 def run():
     # get all needed paths and arguments for the method call.
     parser = argparse.ArgumentParser(prog="codeface-extraction-issues-jira", description="Codeface extraction")
@@ -97,16 +137,22 @@ def run():
     # the issue histories once all issues have been created
     referenced_bys = {}
 
-    # processes every xml-file
-    for current_file in file_list:
-        # 1) load the list of issues
-        issues = load_xml(__srcdir, current_file)
+    # 1) load and 2) re-format the issues of every xml-file, processing the files in parallel
+    num_cores = multiprocessing.cpu_count()
+    parsed_files = Parallel(n_jobs=max(1, num_cores - 1))(
+        delayed(process_xml_file)(__srcdir, current_file, persons, args.skip_history) for current_file in file_list)
+
+    for current_file, parsed_file in zip(file_list, parsed_files):
         # if an error occurred while loading the xml-file
-        if issues is None:
+        if parsed_file is None:
             incorrect_files.append(current_file)
             continue
-        # 2) re-format the issues
-        issues = parse_xml(issues, persons, args.skip_history, referenced_bys)
+        issues, file_referenced_bys = parsed_file
+        # share the repeated values with the issues of the other files
+        for issue in issues:
+            intern_issue_values(issue)
+        for issue_id, referenced_by_events in file_referenced_bys.iteritems():
+            referenced_bys.setdefault(issue_id, []).extend(referenced_by_events)
         # 3) load issue information via api
         if not args.skip_history:
             load_issues_via_api(issues, persons, __conf["issueTrackerURL"], referenced_bys)
@@ -114,9 +160,13 @@ def run():
         processed_issues.extend(issues)
 
     # 4) insert referenced_by events into issue histories
-    for issue_id in referenced_bys.keys():
+    # index the issues by their ids once instead of searching all issues for every referenced issue
+    issues_by_id = dict()
+    for issue in processed_issues:
+        issues_by_id.setdefault(issue["externalId"], []).append(issue)
+    for issue_id in referenced_bys:
         # obtain list of issues which have the current issue id
-        referenced_issue = list(filter(lambda issue: issue["externalId"] == issue_id, processed_issues))
+        referenced_issue = issues_by_id.get(issue_id, [])
         if len(referenced_issue) > 0:
             if len(referenced_issue) > 1:
                 log.warning("Ambiguous issue id " + issue_id + " found in the issue list.")
@@ -126,14 +176,12 @@ def run():
 
     # 5) update user data with Codeface database
     processed_issues = insert_user_data(processed_issues, __conf)
-    # 6) dump result to disk
+    # 6) dump result and bug issues to disk
     print_to_disk(processed_issues, __resdir)
     # # 7) export for Gephi
     # print_to_disk_gephi(processed_issues, __resdir)
     # # 8) export for jira issue extraction to use them in dev-network-growth
     # print_to_disk_extr(processed_issues, __resdir)
-    # 9) dump bug issues to disk
-    print_to_disk_bugs(processed_issues, __resdir)
 
     log.info("Jira issue processing complete!")
     log.info("In total, " + str(jira_request_counter) + " requests have been sent to Jira.")
@@ -162,26 +210,33 @@ def clear_result_files(results_folder):
         open(output_file, "w+").close()
 
 
-def load_xml(source_folder, xml_file):
+def process_xml_file(source_folder, xml_file, persons, skip_history):
     """
-    Load issues from disk.
+    Load and parse the issues of the given xml-file.
+    As the xml-files are independent of each other, this can be run for several files in parallel.
 
     :param source_folder: the folder where to .xml-file is in
     :param xml_file: the given xml-file
-    :return: the loaded issue data
+    :param persons: list of persons from JIRA (incl. e-mail addresses), see function "load_csv"
+    :param skip_history: flag if the history will be loaded in a different method
+    :return: a tuple of the list of parsed issues and the dict of referenced_by events found in them,
+             or None if the xml-file could not be loaded
     """
 
     srcfile = os.path.join(source_folder, xml_file)
     log.devinfo("Loading issues from file '{}'...".format(srcfile))
 
+    # 1) load and 2) re-format the issues while streaming through the xml-file
+    referenced_bys = {}
     try:
-        # parse the xml-file
-        issue_data = parse(srcfile)
-        return issue_data
-    except Exception as e:
+        issues = parse_xml(srcfile, persons, skip_history, referenced_bys)
+    except (IOError, OSError, etree.ParseError) as e:
+        # only errors while reading the file are caught, errors in the parsed data are still raised
         log.info("Issue file " + format(srcfile) + " couldn't be opened because of a " + e.__class__.__name__)
         return None
 
+    return issues, referenced_bys
+
 
 def format_time(time):
     """
@@ -194,9 +249,92 @@ def format_time(time):
     # empty time would be formatted to current date
     if time == "" or time is None:
         return ""
-    else:
+
+    # ISO 8601 times (as returned by the Jira API) already contain the needed format,
+    # so they only need to be sliced, i.e., "2017-06-05T12:34:56.000+0000" becomes "2017-06-05 12:34:56"
+    if (len(time) >= 19 and time[4] == "-" and time[7] == "-" and time[10] in ("T", " ")
+            and time[13] == ":" and time[16] == ":"):
+        return time[:10] + " " + time[11:19]
+
+    # check buffer to avoid parsing the same time repeatedly
+    if time in formatted_times:
+        return formatted_times[time]
+
+    # RFC 2822 times (as used in the Jira XML files) are split into their parts directly,
+    # e.g., "Mon, 5 Jun 2017 12:34:56 +0000"; the UTC offset is ignored, as the given local time is kept
+    d = None
+    parts = time.split()
+    if len(parts) in (5, 6) and parts[2] in month_numbers:
+        try:
+            hour, minute, second = parts[4].split(":")
+            d = datetime(int(parts[3]), month_numbers[parts[2]], int(parts[1]), int(hour), int(minute), int(second))
+        except ValueError:
+            d = None
+
+    # fall back to the generic (but very slow) date parser for all other formats
+    if d is None:
         d = dateparser.parse(time)
-        return d.strftime("%Y-%m-%d %H:%M:%S")
+
+    formatted_time = d.strftime(datetime_format)
+    formatted_times[time] = formatted_time
+    return formatted_time
+
+
+def intern_value(value):
+    """
+    Get the shared object for the given value (see "interned_values").
+    Other than the builtin "intern", this also works for unicode strings.
+
+    :param value: the value to intern
+    :return: the shared object equal to the given value
+    """
+
+    return interned_values.setdefault(value, value)
+
+
+def intern_issue_values(issue):
+    """
+    Replace the repeated values of the given issue (see "parse_xml") by their shared objects.
+
+    :param issue: the issue to intern the values of
+    """
+
+    for key in ("type", "type_list_json", "state", "state_new", "projectId", "resolution", "resolution_list_json",
+                "components_json"):
+        issue[key] = intern_value(issue[key])
+    issue["type_list"][1] = intern_value(issue["type_list"][1])
+    issue["components"] = [intern_value(component) for component in issue["components"]]
+    for relation in issue["relations"]:
+        relation["relation"] = intern_value(relation["relation"])
+
+
+def encode_utf8(value):
+    """
+    Encode the given value in UTF-8.
+    Byte strings are returned unchanged, as they are already UTF-8 encoded (see the default encoding above);
+    this is the common case for the mostly ASCII user data and saves the decode/encode round-trip.
+
+    :param value: the value to encode
+    :return: the UTF-8 encoded byte string of the value
+    """
+
+    if type(value) is str:
+        return value
+    return unicode(value).encode("utf-8")
+
+
+def lower_utf8(value):
+    """
+    Lowercase the given value and encode it in UTF-8.
+    Byte strings are decoded before, so that also non-ASCII letters are lowercased.
+
+    :param value: the value to lowercase
+    :return: the lowercase UTF-8 encoded byte string of the value
+    """
+
+    if type(value) is str:
+        value = value.decode("utf-8")
+    return encode_utf8(value.lower())
 
 
 def create_user(name, username, email):
@@ -216,12 +354,7 @@ def create_user(name, username, email):
     if email is None:
         email = ""
 
-    user = dict()
-    user["name"] = name
-    user["username"] = username
-    user["email"] = email
-
-    return user
+    return User(name, username, email)
 
 
 def merge_user_with_user_from_csv(user, persons):
@@ -234,33 +367,31 @@ def merge_user_with_user_from_csv(user, persons):
     :return: list of merged users
     """
 
-    new_user = dict()
-    name_utf8 = unicode(user["name"]).encode("utf-8")
-    username_utf8 = unicode(user["username"].lower()).encode("utf-8")
-
-    if username_utf8 in persons["by_username"].keys():
-        new_user["username"] = username_utf8
-        new_user["name"] = unicode(persons["by_username"].get(username_utf8)[0]).encode("utf-8")
-        new_user["email"] = unicode(persons["by_username"].get(username_utf8)[1]).encode("utf-8")
-    elif name_utf8 in persons["by_name"].keys():
-        new_user["username"] = username_utf8
-        new_user["name"] = unicode(persons["by_name"].get(name_utf8)[0]).encode("utf-8")
-        new_user["email"] = unicode(persons["by_name"].get(name_utf8)[1]).encode("utf-8")
+    name_utf8 = encode_utf8(user.name)
+    username_utf8 = lower_utf8(user.username)
+
+    # the person data is already utf-8 encoded and keyed by lowercase usernames (see function "load_csv")
+    person = persons["by_username"].get(username_utf8)
+    if person is None:
+        person = persons["by_name"].get(name_utf8)
+
+    if person is not None:
+        new_user = User(person[0], username_utf8, person[1])
     else:
-        new_user["username"] = username_utf8
-        new_user["name"] = name_utf8
-        new_user["email"] = unicode(user["email"]).encode("utf-8")
+        new_user = User(name_utf8, username_utf8, encode_utf8(user.email))
         log.warning("User not in csv-file: " + str(user))
 
-    log.info("current User: " + str(user) + ",    new user: " + str(new_user))
+    # this is called for every single user occurrence, so only format the message if it gets logged at all
+    log.debug("current User: %s,    new user: %s", user, new_user)
     return new_user
 
 
-def parse_xml(issue_data, persons, skip_history, referenced_bys):
+def parse_xml(srcfile, persons, skip_history, referenced_bys):
     """
-    Parse issues from the xml-data.
+    Parse issues from the given xml-file.
+    The file is parsed incrementally, so that only the currently parsed issue is kept in memory as xml elements.
 
-    :param issue_data: list of xml-files
+    :param srcfile: the path of the xml-file
     :param persons: list of persons from JIRA (incl. e-mail addresses), see function "load_csv"
     :param skip_history: flag if the history will be loaded in a different method
     :param referenced_bys: dict to store all referenced_by events in, which need to be inserted into issues later
@@ -269,142 +400,149 @@ def parse_xml(issue_data, persons, skip_history, referenced_bys):
 
     log.info("Parse jira issues...")
     issues = list()
-    issuelist = issue_data.getElementsByTagName("item")
-    # re-process all issues
-    log.debug("Number of issues:" + str(len(issuelist)))
-    for issue_x in issuelist:
+    # re-process all issues, each as soon as it is completely parsed
+    for _, issue_x in etree.iterparse(srcfile, events=("end",)):
+        if issue_x.tag != "item":
+            continue
+
         # temporary container for references
         comments = list()
         issue = dict()
         components = []
 
+        # collect the child elements of the issue by their tag names in a single sweep,
+        # as each search for a tag name traverses the complete subtree of the issue
+        fields = dict()
+        for node in issue_x:
+            fields.setdefault(node.tag, []).append(node)
+
+        # the comments and the issue links are grouped in the child elements "comments" and "issuelinks"
+        comment_nodes = [comment_x for comments_x in fields.get("comments", []) for comment_x in comments_x]
+        link_type_nodes = [link_type for links in fields.get("issuelinks", []) for link_type in links]
+
         # parse values form xml
         # add issue values to the issue
-        key = issue_x.getElementsByTagName("key")[0]
-        issue["id"] = key.attributes["id"].value
-        issue["externalId"] = key.firstChild.data
+        key = fields["key"][0]
+        issue["id"] = key.get("id")
+        issue["externalId"] = key.text
 
-        created = issue_x.getElementsByTagName("created")[0]
-        createDate = created.firstChild.data
+        created = fields["created"][0]
+        createDate = created.text
         issue["creationDate"] = format_time(createDate)
 
-        resolved = issue_x.getElementsByTagName("resolved")
+        resolved = fields.get("resolved", [])
         issue["resolveDate"] = ""
         if (len(resolved) > 0) and (not resolved[0] is None):
-            resolveDate = resolved[0].firstChild.data
+            resolveDate = resolved[0].text
             issue["resolveDate"] = format_time(resolveDate)
 
-        title = issue_x.getElementsByTagName("title")[0]
-        issue["title"] = title.firstChild.data
+        title = fields["title"][0]
+        issue["title"] = title.text
 
-        link = issue_x.getElementsByTagName("link")[0]
-        issue["url"] = link.firstChild.data
+        link = fields["link"][0]
+        issue["url"] = link.text
 
-        type = issue_x.getElementsByTagName("type")[0]
-        issue["type"] = type.firstChild.data
-        issue["type_list"] = ["issue", str(type.firstChild.data.lower())]
+        type = fields["type"][0]
+        issue["type"] = intern_value(type.text)
+        issue["type_list"] = ["issue", intern_value(str(type.text.lower()))]
+        issue["type_list_json"] = intern_value(json_encoder.encode(issue["type_list"]))
 
-        status = issue_x.getElementsByTagName("status")[0]
-        issue["state"] = status.firstChild.data
-        issue["state_new"] = status.firstChild.data.lower()
+        status = fields["status"][0]
+        issue["state"] = intern_value(status.text)
+        issue["state_new"] = intern_value(status.text.lower())
 
-        project = issue_x.getElementsByTagName("project")[0]
-        issue["projectId"] = project.attributes["id"].value
-
-        resolution = issue_x.getElementsByTagName("resolution")[0]
-        issue["resolution"] = resolution.firstChild.data
-        issue["resolution_list"] = [str(resolution.firstChild.data.lower())]
+        project = fields["project"][0]
+        issue["projectId"] = intern_value(project.get("id"))
 
+        resolution = fields["resolution"][0]
+        issue["resolution"] = intern_value(resolution.text)
+        resolution_lower = str(resolution.text.lower())
         # consistency to default GitHub labels
-        if issue["resolution"] == "Won't Fix":
-            issue["resolution_list"] = ["wontfix"]
+        issue["resolution_list"] = [resolution_mapping.get(resolution_lower, resolution_lower)]
+        issue["resolution_list_json"] = intern_value(json_encoder.encode(issue["resolution_list"]))
 
-        # consistency to default GitHub labels
-        if issue["resolution"] == "Won't Do":
-            issue["resolution_list"] = ["wontdo"]
-
-        for component in issue_x.getElementsByTagName("component"):
-            components.append(str(component.firstChild.data))
+        for component in fields.get("component", []):
+            components.append(intern_value(str(component.text)))
         issue["components"] = components
+        issue["components_json"] = intern_value(json_encoder.encode(components))
 
         # if links are not loaded via api, they are added as a history event with less information
         if skip_history:
             issue["history"] = []
-            for ref in issue_x.getElementsByTagName("issuelinktype"):
-                history = dict()
-                history["event"] = "add_link"
-                history["author"] = create_user("", "", "")
-                history["date"] = ""
-                history["event_info_1"] = ref.getElementsByTagName("issuekey")[0].firstChild.data
-                history["event_info_2"] = "issue"
+            for ref in link_type_nodes:
+                # construct the events as dict literals, as this is done for every link of every issue
+                history = {
+                    "event": "add_link",
+                    "author": create_user("", "", ""),
+                    "date": "",
+                    "event_info_1": ref.find(".//issuekey").text,
+                    "event_info_2": "issue"
+                }
 
                 issue["history"].append(history)
 
-                referenced_by = dict()
-                referenced_by["event"] = "referenced_by"
-                referenced_by["author"] = create_user("", "", "")
-                referenced_by["date"] = ""
-                referenced_by["event_info_1"] = issue["externalId"]
-                referenced_by["event_info_2"] = "issue"
+                referenced_by = {
+                    "event": "referenced_by",
+                    "author": create_user("", "", ""),
+                    "date": "",
+                    "event_info_1": issue["externalId"],
+                    "event_info_2": "issue"
+                }
 
                 if history["event_info_1"] in referenced_bys:
                     referenced_bys[history["event_info_1"]].append(referenced_by)
                 else:
                     referenced_bys[history["event_info_1"]] = [referenced_by]
 
-        reporter = issue_x.getElementsByTagName("reporter")[0]
-        user = create_user(reporter.firstChild.data, reporter.attributes["username"].value, "")
+        reporter = fields["reporter"][0]
+        user = create_user(reporter.text, reporter.get("username"), "")
         issue["author"] = merge_user_with_user_from_csv(user, persons)
 
-        issue["title"] = issue_x.getElementsByTagName("title")[0].firstChild.data
-
         # add comments / issue_changes to the issue
-        for comment_x in issue_x.getElementsByTagName("comment"):
-            comment = dict()
-            comment["id"] = comment_x.attributes["id"].value
-            user = create_user("", comment_x.attributes["author"].value, "")
-            comment["author"] = merge_user_with_user_from_csv(user, persons)
-            comment["state_on_creation"] = issue["state"]  # can get updated if history is retrieved
-            comment["resolution_on_creation"] = issue["resolution"]  # can get updated if history is retrieved
-
-            created = comment_x.attributes["created"].value
-            comment["changeDate"] = format_time(created)
-
-            text = comment_x.firstChild
-            if text is None:
+        for comment_x in comment_nodes:
+            user = create_user("", comment_x.get("author"), "")
+            created = comment_x.get("created")
+            # construct the comment as dict literal, as this is done for every comment of every issue
+            comment = {
+                "id": comment_x.get("id"),
+                "author": merge_user_with_user_from_csv(user, persons),
+                "state_on_creation": issue["state"],  # can get updated if history is retrieved
+                "resolution_on_creation": issue["resolution"],  # can get updated if history is retrieved
+                "changeDate": format_time(created),
+                "issueId": issue["id"]
+            }
+
+            # the comment text is not part of any output, so it is not kept in the comment; comment bodies are
+            # by far the largest part of the issue data, which is passed back from the parallel workers
+            if comment_x.text is None:
                 log.warn("Empty comment in issue " + issue["id"])
-                comment["text"] = ""
-            else:
-                comment["text"] = text.data
-            comment["issueId"] = issue["id"]
             comments.append(comment)
 
         issue["comments"] = comments
 
         # add relations to the issue
         relations = list()
-        for rel in issue_x.getElementsByTagName("issuelinktype"):
-            relation = dict()
-            relation["relation"] = rel.getElementsByTagName("name")[0].firstChild.data
-
-            if rel.hasAttribute("inwardlinks"):
-                left = rel.getElementsByTagName("inwardlinks")
-                issuekeys = left.getElementsByTagName("issuekey")
-                for key in issuekeys:
-                    relation["type"] = "inward"
-                    relation["id"] = key.firstChild.data
-                    relations.append(relation)
-
-            if rel.hasAttribute("outwardlinks"):
-                right = rel.getElementsByTagName("outwardlinks")
-                issuekeys = right.getElementsByTagName("issuekey")
-                for key in issuekeys:
-                    relation["type"] = "outward"
-                    relation["id"] = key.firstChild.data
-                    relations.append(relation)
+        for rel in link_type_nodes:
+            relation_name = intern_value(rel.find("name").text)
+
+            # the linked issues are contained in the child elements "inwardlinks" and "outwardlinks"
+            for child in rel:
+                if child.tag == "inwardlinks":
+                    relation_type = "inward"
+                elif child.tag == "outwardlinks":
+                    relation_type = "outward"
+                else:
+                    continue
+
+                for key in child.iter("issuekey"):
+                    relations.append({"relation": relation_name, "type": relation_type, "id": key.text})
 
         issue["relations"] = relations
         issues.append(issue)
+
+        # free the memory of the already processed xml elements of the issue
+        # (only the empty element of the issue itself stays in the parsed xml tree)
+        issue_x.clear()
     log.debug("number of issues after parse_xml: '{}'".format(len(issues)))
     return issues
 
@@ -437,7 +575,9 @@ def load_issues_via_api(issues, persons, url, referenced_bys):
             # send JIRA request for current issues and increase request counter
             jira_request_counter += 1
             log.info("JIRA request counter: " + str(jira_request_counter))
-            api_issue = jira_project.issue(issue["externalId"], expand="changelog")
+            # only the changelog is needed, so restrict the returned fields to the cheapest one
+            # (the changelog is expanded independently of the requested fields)
+            api_issue = jira_project.issue(issue["externalId"], fields="summary", expand="changelog")
             changelog = api_issue.changelog
         except JIRAError:
             log.warn("JIRA Error: Changelog cannot be extracted for issue " + issue["externalId"] + ". History omitted!")
@@ -513,8 +653,8 @@ def load_issues_via_api(issues, persons, url, referenced_bys):
                         history["author"] = merge_user_with_user_from_csv(user, persons)
                         assignee = create_user(item.toString, item.to, "")
                         assigned_user = merge_user_with_user_from_csv(assignee, persons)
-                        history["event_info_1"] = assigned_user["name"]
-                        history["event_info_2"] = assigned_user["email"]
+                        history["event_info_1"] = assigned_user.name
+                        history["event_info_2"] = assigned_user.email
                         history["date"] = format_time(change.created)
                         histories.append(history)
 
@@ -590,49 +730,45 @@ def insert_user_data(issues, conf):
     user_buffer = dict()
     # create buffer for user ids (key: user string)
     user_id_buffer = dict()
+    # create buffer for user strings (key: user tuple as given)
+    user_string_buffer = dict()
+    # create buffer for the name and e-mail address of user strings (key: user string),
+    # keeping the user strings in the order of their first occurrence
+    user_parts_buffer = OrderedDict()
     # open database connection
     dbm = DBManager(conf)
     # open ID-service connection
     idservice = idManager(dbm, conf)
 
-    def get_user_string(name, email):
-        if not email or email is None:
-            return "{name}".format(name=name)
-            # return "{name} <{name}@default.com>".format(name=name)  # for debugging only
-        else:
-            return "{name} <{email}>".format(name=name, email=email)
+    def get_user_string_of_user(user, buffer_users=user_string_buffer, buffer_parts=user_parts_buffer):
+        # the same users occur in many issues, comments, and events, so check the buffer
+        # before encoding the user and constructing its user string
+        user_string = buffer_users.get(user)
+        if user_string is not None:
+            return user_string
 
-    def get_id_and_update_user(user, buffer_db_ids=user_id_buffer):
         # fix encoding for name and e-mail address
-        if user["name"] is not None and user["name"] != "":
-            name = unicode(user["name"]).encode("utf-8")
+        if user.name is not None and user.name != "":
+            name = encode_utf8(user.name)
         else:
-            name = unicode(user["username"]).encode("utf-8")
-        mail = unicode(user["email"]).encode("utf-8")  # empty
-        # construct string for ID service and send query
-        user_string = get_user_string(name, mail)
-
-        # check buffer to reduce amount of DB queries
-        if user_string in buffer_db_ids:
-            log.devinfo("Returning person id for user '{}' from buffer.".format(user_string))
-            return buffer_db_ids[user_string]
-
-        # get person information from ID service
-        log.devinfo("Passing user '{}' to ID service.".format(user_string))
-        idx = idservice.getPersonID(user_string)
+            name = encode_utf8(user.username)
+        mail = encode_utf8(user.email)  # empty
+        # construct string for ID service
+        user_string = id_service.get_user_string(name, mail)
 
-        # add user information to buffer
-        # user_string = get_user_string(user["name"], user["email"]) # update for
-        buffer_db_ids[user_string] = idx
+        # add user string to buffer
+        buffer_users[user] = user_string
+        buffer_parts[user_string] = (name, mail)
 
-        return idx
+        return user_string
 
     def get_user_from_id(idx, buffer_db=user_buffer):
 
-        # check whether user information is in buffer to reduce amount of DB queries
-        if idx in buffer_db:
-            log.devinfo("Returning user '{}' from buffer.".format(idx))
-            return buffer_db[idx]
+        # check whether user information is in buffer to reduce amount of DB queries;
+        # the buffered user dict is shared by reference by all issues, comments, and events of this user
+        user = buffer_db.get(idx)
+        if user is not None:
+            return user
 
         # get person information from ID service
         log.devinfo("Passing user id '{}' to ID service.".format(idx))
@@ -647,41 +783,70 @@ def insert_user_data(issues, conf):
 
         return user
 
-
-    # check and update database for all occurring users
+    def get_users_from_ids(idxs, buffer_db=user_buffer):
+        # only query the users which are not in the buffer yet
+        idxs = [idx for idx in set(idxs) if idx not in buffer_db]
+        if not idxs:
+            return
+
+        # get person information for the users from the database in a few large queries
+        # (the ids are passed as a tuple, as DBManager passes lists of arguments to 'executemany')
+        for i in range(0, len(idxs), user_query_size):
+            chunk = tuple(idxs[i:i + user_query_size])
+            log.devinfo("Passing {} user ids to the database.".format(len(chunk)))
+            dbm.doExec("SELECT id, name, email1 FROM person WHERE id IN ({})".format(", ".join(["%s"] * len(chunk))),
+                       chunk)
+            for (idx, name, email) in dbm.doFetchAll():
+                user = dict()
+                user["email"] = email  # column "email1"
+                user["name"] = name  # column "name"
+                user["id"] = idx  # column "id"
+
+                # add user information to buffer
+                buffer_db[idx] = user
+
+
+    # construct the user strings for all occurring users
     for issue in issues:
-        # check database for issue author
-        issue["author"] = get_id_and_update_user(issue["author"])
+        # issue author
+        issue["author"] = get_user_string_of_user(issue["author"])
 
-        # check database for comment authors
+        # comment authors
         for comment in issue["comments"]:
-            comment["author"] = get_id_and_update_user(comment["author"])
+            comment["author"] = get_user_string_of_user(comment["author"])
 
-        # check database for event authors in the history
+        # event authors in the history
         for event in issue["history"]:
-            event["author"] = get_id_and_update_user(event["author"])
+            event["author"] = get_user_string_of_user(event["author"])
 
-            # check database for target user if needed
+            # target user if needed
             if event["event"] == "assigned":
-                assigned_user = get_id_and_update_user(create_user(event["event_info_1"], "", event["event_info_2"]))
+                assigned_user = get_user_string_of_user(create_user(event["event_info_1"], "", event["event_info_2"]))
                 event["event_info_1"] = assigned_user
 
-    # get all users after database updates having been performed
+    # check and update database for all occurring users
+    id_service.get_ids_from_user_strings(user_parts_buffer.keys(), user_parts_buffer, user_id_buffer,
+                                         idservice, dbm, conf)
+
+    # get all users after database updates having been performed, using a single database query
+    # (users not retrieved by this query are still fetched one by one from the ID service below)
+    get_users_from_ids(user_id_buffer.values())
+
     for issue in issues:
         # get issue author
-        issue["author"] = get_user_from_id(issue["author"])
+        issue["author"] = get_user_from_id(user_id_buffer[issue["author"]])
 
         # get comment authors
         for comment in issue["comments"]:
-            comment["author"] = get_user_from_id(comment["author"])
+            comment["author"] = get_user_from_id(user_id_buffer[comment["author"]])
 
         # get event authors for non-comment events
         for event in issue["history"]:
-            event["author"] = get_user_from_id(event["author"])
+            event["author"] = get_user_from_id(user_id_buffer[event["author"]])
 
             # get target user if needed
             if event["event"] == "assigned":
-                assigned_user = get_user_from_id(event["event_info_1"])
+                assigned_user = get_user_from_id(user_id_buffer[event["event_info_1"]])
                 event["event_info_1"] = assigned_user["name"]
                 event["event_info_2"] = assigned_user["email"]
 
@@ -691,196 +856,103 @@ def insert_user_data(issues, conf):
 
 def print_to_disk(issues, results_folder):
     """
-    Print issues to file "issues-jira.list" in result folder.
+    Print issues to file "issues-jira.list" and bug issues to file "bugs-jira.list" in result folder.
+    Both files are written in a single pass over the issues, as the lines of a bug issue are the same in both files.
+    The format is consistent to the format of "print_to_disk" in "issue_processing.py".
 
     :param issues: the issues to dump
-    :param results_folder: the folder where to place "issues-jira.list" output file
+    :param results_folder: the folder where to place "issues-jira.list" and "bugs-jira.list" output files
     """
 
-    # construct path to output file
+    # construct path to output files
     output_file = os.path.join(results_folder, "issues-jira.list")
+    output_file_bugs = os.path.join(results_folder, "bugs-jira.list")
     log.info("Dumping output in file '{}'...".format(output_file))
-
-    # construct lines of output
-    lines = []
-    for issue in issues:
-        log.info("Current issue '{}'".format(issue["externalId"]))
-
-        # add the creation event
-        lines.append((
-            issue["externalId"],
-            issue["title"],
-            json.dumps(issue["type_list"]),
-            issue["state_new"],
-            json.dumps(issue["resolution_list"]),
-            issue["creationDate"],
-            issue["resolveDate"],
-            json.dumps(issue["components"]),
-            "created",  ## event.name
-            issue["author"]["name"],
-            issue["author"]["email"],
-            issue["creationDate"],
-            "open",  ## default state when created
-            json.dumps(["unresolved"])  ## default resolution when created
-        ))
-
-        # add an additional commented event for the creation
-        lines.append((
-            issue["externalId"],
-            issue["title"],
-            json.dumps(issue["type_list"]),
-            issue["state_new"],
-            json.dumps(issue["resolution_list"]),
-            issue["creationDate"],
-            issue["resolveDate"],
-            json.dumps(issue["components"]),
-            "commented",
-            issue["author"]["name"],
-            issue["author"]["email"],
-            issue["creationDate"],
-            "open",  ##  default state when created
-            json.dumps(["unresolved"])  ## default resolution when created
-        ))
-
-        # add comment events
-        for comment in issue["comments"]:
-            lines.append((
-                issue["externalId"],
-                issue["title"],
-                json.dumps(issue["type_list"]),
-                issue["state_new"],
-                json.dumps(issue["resolution_list"]),
-                issue["creationDate"],
-                issue["resolveDate"],
-                json.dumps(issue["components"]),
-                "commented",
-                comment["author"]["name"],
-                comment["author"]["email"],
-                comment["changeDate"],
-                comment["state_on_creation"],
-                json.dumps(comment["resolution_on_creation"])
-            ))
-
-        # add history events
-        for history in issue["history"]:
-            lines.append((
-                issue["externalId"],
-                issue["title"],
-                json.dumps(issue["type_list"]),
-                issue["state_new"],
-                json.dumps(issue["resolution_list"]),
-                issue["creationDate"],
-                issue["resolveDate"],
-                json.dumps(issue["components"]),
-                history["event"],
-                history["author"]["name"],
-                history["author"]["email"],
-                history["date"],
-                history["event_info_1"],
-                json.dumps(history["event_info_2"])
-            ))
-
-    # write to output file
-    csv_writer.write_to_csv(output_file, lines, append=True)
+    log.info("Dumping output in file '{}'...".format(output_file_bugs))
+
+    # construct lines of output per issue and stream them to the two output files
+    with csv_writer.open_csv_file(output_file, append=True) as issues_file, \
+            csv_writer.open_csv_file(output_file_bugs, append=True) as bugs_file:
+        issues_writer = csv_writer.create_writer(issues_file)
+        bugs_writer = csv_writer.create_writer(bugs_file)
+        for issue in issues:
+            # only write issues with type bug and their comments in the bug output file
+            if "bug" in issue["type_list"]:
+                lines = list(get_issue_lines(issue))
+                csv_writer.write_lines(issues_writer, lines)
+                csv_writer.write_lines(bugs_writer, lines)
+            else:
+                csv_writer.write_lines(issues_writer, get_issue_lines(issue))
 
 
-def print_to_disk_bugs(issues, results_folder):
+def get_issue_lines(issue):
     """
-    Extract bug issues and prints them to file "bugs-jira.list" in result folder.
-    This method prints in a format which is consistent to the format of "print_to_disk" in "issue_processing.py".
+    Construct the output lines for the given issue, i.e., its creation event, the commented event
+    for the creation, and all of its comment and history events.
 
-    :param issues: the issues to sort of bugs
-    :param results_folder: the folder where to place "bugs-jira.list" output file
+    :param issue: the issue to construct the output lines for
+    :return: a generator yielding the output lines (tuples of columns) of the issue
     """
 
-    # construct path to output file
-    output_file = os.path.join(results_folder, "bugs-jira.list")
-    log.info("Dumping output in file '{}'...".format(output_file))
+    # the issue columns are the same for all lines of the issue, so construct them only once and prepend them to
+    # the event columns of every line; the list columns are already encoded while parsing the issue
+    # (see function "parse_xml")
+    creation_date = issue["creationDate"]
+    issue_columns = (
+        issue["externalId"],
+        issue["title"],
+        issue["type_list_json"],
+        issue["state_new"],
+        issue["resolution_list_json"],
+        creation_date,
+        issue["resolveDate"],
+        issue["components_json"]
+    )
+    author = issue["author"]
+
+    # add the creation event
+    yield issue_columns + (
+        "created",  ## event.name
+        author["name"],
+        author["email"],
+        creation_date,
+        "open",  ## default state when created
+        default_resolution_json  ## default resolution when created
+    )
 
-    # construct lines of output
-    lines = []
-    for issue in issues:
-        log.info("Current issue '{}'".format(issue["externalId"]))
-
-        # only write issues with type bug and their comments in the output file
-        if "bug" in issue["type_list"]:
-
-            # add the creation event
-            lines.append((
-                issue["externalId"],
-                issue["title"],
-                json.dumps(issue["type_list"]),
-                issue["state_new"],
-                json.dumps(issue["resolution_list"]),
-                issue["creationDate"],
-                issue["resolveDate"],
-                json.dumps(issue["components"]),
-                "created",  ## event.name
-                issue["author"]["name"],
-                issue["author"]["email"],
-                issue["creationDate"],
-                "open",  ## default state when created
-                json.dumps(["unresolved"]) ## default resolution when created
-            ))
-
-            # add an additional commented event for the creation
-            lines.append((
-                issue["externalId"],
-                issue["title"],
-                json.dumps(issue["type_list"]),
-                issue["state_new"],
-                json.dumps(issue["resolution_list"]),
-                issue["creationDate"],
-                issue["resolveDate"],
-                json.dumps(issue["components"]),
-                "commented",
-                issue["author"]["name"],
-                issue["author"]["email"],
-                issue["creationDate"],
-                "open",  ##  default state when created
-                json.dumps(["unresolved"])  ## default resolution when created
-            ))
-
-            # add comment events
-            for comment in issue["comments"]:
-                lines.append((
-                    issue["externalId"],
-                    issue["title"],
-                    json.dumps(issue["type_list"]),
-                    issue["state_new"],
-                    json.dumps(issue["resolution_list"]),
-                    issue["creationDate"],
-                    issue["resolveDate"],
-                    json.dumps(issue["components"]),
-                    "commented",
-                    comment["author"]["name"],
-                    comment["author"]["email"],
-                    comment["changeDate"],
-                    comment["state_on_creation"],
-                    json.dumps(comment["resolution_on_creation"])
-                ))
-
-            # add history events
-            for history in issue["history"]:
-                lines.append((
-                    issue["externalId"],
-                    issue["title"],
-                    json.dumps(issue["type_list"]),
-                    issue["state_new"],
-                    json.dumps(issue["resolution_list"]),
-                    issue["creationDate"],
-                    issue["resolveDate"],
-                    json.dumps(issue["components"]),
-                    history["event"],
-                    history["author"]["name"],
-                    history["author"]["email"],
-                    history["date"],
-                    history["event_info_1"],
-                    json.dumps(history["event_info_2"])
-                ))
+    # add an additional commented event for the creation
+    yield issue_columns + (
+        "commented",
+        author["name"],
+        author["email"],
+        creation_date,
+        "open",  ##  default state when created
+        default_resolution_json  ## default resolution when created
+    )
 
-    # write to output file
-    csv_writer.write_to_csv(output_file, lines, append=True)
+    # add comment events
+    for comment in issue["comments"]:
+        comment_author = comment["author"]
+        yield issue_columns + (
+            "commented",
+            comment_author["name"],
+            comment_author["email"],
+            comment["changeDate"],
+            comment["state_on_creation"],
+            json_encoder.encode(comment["resolution_on_creation"])
+        )
+
+    # add history events
+    for history in issue["history"]:
+        history_author = history["author"]
+        yield issue_columns + (
+            history["event"],
+            history_author["name"],
+            history_author["email"],
+            history["date"],
+            history["event_info_1"],
+            json_encoder.encode(history["event_info_2"])
+        )
 
 
 def print_to_disk_extr(issues, results_folder):
@@ -895,54 +967,60 @@ def print_to_disk_extr(issues, results_folder):
     output_file = os.path.join(results_folder, "issues.list")
     log.info("Dumping output in file '{}'...".format(output_file))
 
-    # construct lines of output
-    lines = []
-    for issue in issues:
-        log.info("Current issue '{}'".format(issue["externalId"]))
-
-        lines.append((
-            issue["externalId"],
-            issue["state"],
-            issue["creationDate"],
-            issue["resolveDate"],
-            False,  ## Value of is.pull.request
-            issue["author"]["name"],
-            issue["author"]["email"],
-            issue["creationDate"],
-            "",  ## ref.name
-            "open"  ## event.name
-        ))
-
-        lines.append((
-            issue["externalId"],
-            issue["state"],
-            issue["creationDate"],
-            issue["resolveDate"],
-            False,  ## Value of is.pull.request
-            issue["author"]["name"],
-            issue["author"]["email"],
-            issue["creationDate"],
-            "",  ## ref.name
-            "commented"  ## event.name
-        ))
+    # construct lines of output lazily and stream them to the output file
+    lines = (line for issue in issues for line in get_issue_lines_extr(issue))
 
-        for comment in issue["comments"]:
-            lines.append((
-                issue["externalId"],
-                issue["state"],
-                issue["creationDate"],
-                issue["resolveDate"],
-                False,  ## Value of is.pull.request
-                comment["author"]["name"],
-                comment["author"]["email"],
-                comment["changeDate"],
-                "",  ## ref.name
-                "commented"  ## event.name
-            ))
     # write to output file
     csv_writer.write_to_csv(output_file, lines, append=True)
 
 
+def get_issue_lines_extr(issue):
+    """
+    Construct the output lines for the given issue in the format of "print_to_disk_extr".
+
+    :param issue: the issue to construct the output lines for
+    :return: a generator yielding the output lines (tuples of columns) of the issue
+    """
+
+    # the issue columns are the same for all lines of the issue, so construct them only once and prepend them to
+    # the event columns of every line
+    creation_date = issue["creationDate"]
+    issue_columns = (
+        issue["externalId"],
+        issue["state"],
+        creation_date,
+        issue["resolveDate"],
+        False  ## Value of is.pull.request
+    )
+    author = issue["author"]
+
+    yield issue_columns + (
+        author["name"],
+        author["email"],
+        creation_date,
+        "",  ## ref.name
+        "open"  ## event.name
+    )
+
+    yield issue_columns + (
+        author["name"],
+        author["email"],
+        creation_date,
+        "",  ## ref.name
+        "commented"  ## event.name
+    )
+
+    for comment in issue["comments"]:
+        comment_author = comment["author"]
+        yield issue_columns + (
+            comment_author["name"],
+            comment_author["email"],
+            comment["changeDate"],
+            "",  ## ref.name
+            "commented"  ## event.name
+        )
+
+
 def print_to_disk_gephi(issues, results_folder):
     """
     Print issues to file "issues-jira-gephi-nodes.csv" and
@@ -959,27 +1037,44 @@ def print_to_disk_gephi(issues, results_folder):
     log.info("Dumping output in file '{}'...".format(output_file_nodes))
     log.info("Dumping output in file '{}'...".format(output_file_edges))
 
-    # construct lines of output
-    node_lines = []
-    edge_lines = []
-    node_lines.append(("Id", "Type"))
-    edge_lines.append(("Source", "Target", "Timestamp", "Edgetype"))
-    for issue in issues:
-        node_lines.append((issue["externalId"], "Issue"))
-        node_lines.append((issue["author"]["name"], "Person"))
+    # construct lines of output per issue and stream them to the two output files
+    with csv_writer.open_csv_file(output_file_edges, append=True) as edges_file, \
+            csv_writer.open_csv_file(output_file_nodes, append=True) as nodes_file:
+        # create the writers only once for all issues
+        edges_writer = csv_writer.create_writer(edges_file)
+        nodes_writer = csv_writer.create_writer(nodes_file)
+        csv_writer.write_lines(nodes_writer, [("Id", "Type")])
+        csv_writer.write_lines(edges_writer, [("Source", "Target", "Timestamp", "Edgetype")])
+
+        # the same persons occur in many issues and comments, so remember which nodes are already written
+        # to write every node only once
+        written_nodes = set()
+        for issue in issues:
+            node_lines = []
+            edge_lines = []
+            node_lines.append((issue["externalId"], "Issue"))
+            node_lines.append((issue["author"]["name"], "Person"))
+
+            edge_lines.append((issue["author"]["name"], issue["externalId"], issue["creationDate"], "Person-Issue"))
+            for comment in issue["comments"]:
+                node_lines.append((comment["id"], "Comment"))
+                node_lines.append((comment["author"]["name"], "Person"))
 
-        edge_lines.append((issue["author"]["name"], issue["externalId"], issue["creationDate"], "Person-Issue"))
-        for comment in issue["comments"]:
-            node_lines.append((comment["id"], "Comment"))
-            node_lines.append((comment["author"]["name"], "Person"))
+                edge_lines.append((issue["externalId"], comment["id"], comment["changeDate"],
+                                   "Issue-Comment"))
+                edge_lines.append((comment["author"]["name"], comment["id"], comment["changeDate"],
+                                   "Person-Comment"))
 
-            edge_lines.append((issue["externalId"], comment["id"], comment["changeDate"],
-                               "Issue-Comment"))
-            edge_lines.append((comment["author"]["name"], comment["id"], ["changeDate"],
-                               "Person-Comment"))
-    # write to output file
-    csv_writer.write_to_csv(output_file_edges, edge_lines, append=True)
-    csv_writer.write_to_csv(output_file_nodes, node_lines, append=True)
+            # only keep the nodes which have not been written yet, keeping their order
+            new_node_lines = []
+            for node_line in node_lines:
+                if node_line not in written_nodes:
+                    written_nodes.add(node_line)
+                    new_node_lines.append(node_line)
+
+            # write to output files
+            csv_writer.write_lines(edges_writer, edge_lines)
+            csv_writer.write_lines(nodes_writer, new_node_lines)
 
 
 def load_csv(source_folder):
@@ -988,7 +1083,7 @@ def load_csv(source_folder):
 
     :param source_folder: the folder where to find .csv-file
     :return: the loaded person data contained in a dict consisting of two maps:
-             keys are either name ("by_name") or username ("by_username"), values are name-email pairs
+             keys are either name ("by_name") or lowercase username ("by_username"), values are name-email pairs
     """
 
     def find_first_existing(source_folder, filenames):
@@ -1022,16 +1117,32 @@ def load_csv(source_folder):
 
     log.devinfo("Loading person csv from file '{}'...".format(srcfile))
     with open(srcfile, "r") as f:
-        person_data = csv.DictReader(f, delimiter=",", skipinitialspace=True)
+        # read the rows as plain lists instead of constructing a dict per row,
+        # looking up the indices of the needed columns in the header only once
+        person_data = csv.reader(f, delimiter=",", skipinitialspace=True)
+        header = next(person_data)
+        author_id_index = header.index("AuthorID")
+        author_name_index = header.index("AuthorName")
+        user_email_index = header.index("userEmail")
         persons_by_username = {}
         persons_by_name = {}
         for row in person_data:
-            if not row["AuthorID"] in persons_by_username.keys():
-                author_id_utf8 = unicode(row["AuthorID"]).encode("utf-8")
-                persons_by_username[author_id_utf8] = (row["AuthorName"], row["userEmail"])
-            if not row["AuthorName"] in persons_by_name.keys():
-                author_name_utf8 = unicode(row["AuthorName"]).encode("utf-8")
-                persons_by_name[author_name_utf8] = (row["AuthorName"], row["userEmail"])
+            # skip empty lines (as done by DictReader)
+            if not row:
+                continue
+            # skip incomplete lines instead of failing on their missing columns
+            if len(row) < len(header):
+                log.warning("Skipping incomplete line in person file: {}".format(row))
+                continue
+            author_name = row[author_name_index]
+            person = (author_name, row[user_email_index])
+            # usernames are matched case-insensitively, so store them in lowercase only once here
+            # (lowercased the same way as when looking them up, see function "merge_user_with_user_from_csv")
+            author_id = lower_utf8(row[author_id_index])
+            if author_id not in persons_by_username:
+                persons_by_username[author_id] = person
+            if author_name not in persons_by_name:
+                persons_by_name[author_name] = person
 
         persons = dict()
         persons["by_username"] = persons_by_username
@@ -22,6 +22,7 @@ This file is able to extract artifact occurrences in e-mail within mbox files.
 
 import argparse
 import csv
+import itertools
 import mailbox
 import multiprocessing
 import os.path
@@ -39,12 +40,16 @@ from whoosh.qparser import QueryParser
 
 from csv_writer import csv_writer
 
+# maximum number of processes used for creating the search index
+index_writer_procs = 4
+# memory limit (in MB) of each of the processes creating the search index
+index_writer_limitmb = 128
 
-def __get_index(mbox, mbox_path, results_folder, schema, reindex):
+
+def __get_index(mbox_path, results_folder, schema, reindex):
     """Initialize the search index (and create it, if needed
 
-    :param mbox: the mbox object to create the index for
-    :param mbox_path: the path to the mbox object on disk
+    :param mbox_path: the path to the mbox file on disk to create the index for
     :param results_folder: the folder to create the index folder in
     :param schema: the schema for the to be created index
     :param reindex: force reindexing if True
@@ -66,11 +71,21 @@ def __get_index(mbox, mbox_path, results_folder, schema, reindex):
         os.makedirs(index_path)  # create path
         index.create_in(index_path, schema)  # initialize as index path
         ix = index.open_dir(index_path)  # open as index path
-        writer = ix.writer()
-        # add all messages to index
-        for message in mbox:
-            writer.add_document(messageID=unicode(message['message-id']), content=__mbox_getbody(message))
-        writer.commit()
+        # analyze the messages in a few processes in parallel, each writing its own segment
+        # (the segments are not merged afterwards, which is the most expensive part of the commit);
+        # the memory limit applies to each process, so the number of processes is capped
+        num_cores = multiprocessing.cpu_count()
+        writer = ix.writer(procs=max(1, min(index_writer_procs, num_cores - 1)), limitmb=index_writer_limitmb,
+                           multisegment=True)
+        # load mbox file (only needed to create the index)
+        mbox = mailbox.mbox(mbox_path)
+        try:
+            # add all messages to index (committed when leaving the block)
+            with writer:
+                for message in mbox:
+                    writer.add_document(messageID=unicode(message['message-id']), content=__mbox_getbody(message))
+        finally:
+            mbox.close()
         log.devinfo("Index created, parsing will begin now.")
     else:
         # 2.2) load index
@@ -97,14 +112,33 @@ def __get_artifacts(results_folder, files_as_artifacts):
         "file", "artifact", "artifact.type", "artifact.diff.size"  # commit-dependency information
     ]
 
+    # get the column indices only once instead of building a dict for each row
+    file_index = commit_data_columns.index("file")
+    artifact_index = commit_data_columns.index("artifact")
+
+    # the same file occurs in many rows, so keep only one string object per file name
+    # (and, if files are the artifacts, only one tuple per file name)
+    file_names = dict()
+
     commit_set = set()
     with open(os.path.join(results_folder, "commits.list"), 'r') as commit_file:
-        commit_list = csv.DictReader(commit_file, delimiter=';', fieldnames=commit_data_columns)
+        commit_list = csv.reader(commit_file, delimiter=';')
         for row in commit_list:
+            # skip empty lines (as done by DictReader)
+            if not row:
+                continue
+            # skip incomplete lines instead of failing on their missing columns
+            if len(row) <= max(file_index, artifact_index):
+                log.warning("Skipping incomplete line in commit file: {}".format(row))
+                continue
+            file_name = row[file_index]
             if files_as_artifacts:
-                commit_set.add((row["file"], os.path.basename(row["file"])))
+                if file_name not in file_names:
+                    file_names[file_name] = (file_name, os.path.basename(file_name))
+                commit_set.add(file_names[file_name])
             else:
-                commit_set.add((row["file"], row["artifact"]))
+                file_name = file_names.setdefault(file_name, file_name)
+                commit_set.add((file_name, row[artifact_index]))
 
     return commit_set
 
@@ -118,17 +152,13 @@ def __mbox_getbody(message):
 
     __text_indicator = "text/"
 
+    # walk the MIME tree of the message once (this also covers non-multipart messages)
+    # and use the first text part as body
     body = None
-    if message.is_multipart():
-        for part in message.walk():
-            if part.is_multipart():
-                for subpart in part.walk():
-                    if __text_indicator in subpart.get_content_type().lower():
-                        body = subpart.get_payload(decode=True)
-            elif __text_indicator in part.get_content_type().lower():
-                body = part.get_payload(decode=True)
-    elif __text_indicator in message.get_content_type().lower():
-        body = message.get_payload(decode=True)
+    for part in message.walk():
+        if not part.is_multipart() and part.get_content_type().startswith(__text_indicator):
+            body = part.get_payload(decode=True)
+            break
 
     if body is None:
         log.devinfo(message.get_content_type())
@@ -139,37 +169,38 @@ def __mbox_getbody(message):
     return unicode(body, errors="replace")
 
 
-def __parse_execute(artifact, schema, my_index, include_filepath):
-    """ Execute the search for the given commit
+def __parse_execute(artifacts, schema, my_index, include_filepath):
+    """ Execute the search for the given commits
 
-    :param artifact: the (file name, artifact) tuple to search for
+    :param artifacts: the list of (file name, artifact) tuples to search for
     :param schema: the search schema to use
     :param my_index: the search index to use
     :param include_filepath: indicator whether to use the 'file name' part of the artifact into account
-    :return: a match list of tuples (file name, artifact, message ID)
+    :return: a list of the IDs of the matching messages for each of the given artifacts (in the same order)
     """
 
-    log.devinfo("Searching for artifact ({}, {})...".format(artifact[0], artifact[1]))
-
     result = []
 
+    # open the searcher and initialize the query parser only once for all given artifacts
     with my_index.searcher() as searcher:
         # initialize query parser
         query_parser = QueryParser("content", schema=schema)
 
-        # construct query
-        if include_filepath:
-            my_query = query_parser.parse('"%s" AND "%s"' % (artifact[0], artifact[1]))
-        else:
-            my_query = query_parser.parse("\"%s\"" % artifact[1])
+        for artifact in artifacts:
+            log.devinfo("Searching for artifact ({}, {})...".format(artifact[0], artifact[1]))
+
+            # construct query
+            if include_filepath:
+                my_query = query_parser.parse('"%s" AND "%s"' % (artifact[0], artifact[1]))
+            else:
+                my_query = query_parser.parse("\"%s\"" % artifact[1])
 
-        # search!
-        query_result = searcher.search(my_query, terms=True, optimize=False, limit=None)
+            # search!
+            # (the matched terms and scores are not needed, so they are neither recorded nor computed for the hits)
+            query_result = searcher.search(my_query, optimize=False, limit=None, scored=False)
 
-        # construct result from query answer
-        for r in query_result:
-            result_tuple = (artifact[0], artifact[1], r["messageID"])
-            result.append(result_tuple)
+            # construct result from query answer
+            result.append([r["messageID"] for r in query_result])
 
     return result
 
@@ -185,33 +216,50 @@ def parse(mbox_name, results_folder, include_filepath, files_as_artifacts, reind
     :param append_result: flag whether to append the results for the current mbox file to the output file
     """
 
-    # load mbox file
-    mbox = mailbox.mbox(mbox_name)
-
     # create schema for text search
     analyzer = StandardAnalyzer(expression=r"[^\s,:\"']+")  # split by whitespace, commas, colons, and quotation marks.
     schema = Schema(messageID=ID(stored=True), content=TEXT(analyzer=analyzer))
 
     # create/load index (initialize if necessary)
-    ix = __get_index(mbox, mbox_name, results_folder, schema, reindex)
+    ix = __get_index(mbox_name, results_folder, schema, reindex)
 
     # extract artifacts from results folder
-    artifacts = __get_artifacts(results_folder, files_as_artifacts)
+    artifacts = list(__get_artifacts(results_folder, files_as_artifacts))
+
+    # artifacts with the same query (i.e., with the same artifact name if the file path is not included in the search)
+    # have the same search results, so only search for one representative artifact per distinct query
+    query_keys = [artifact if include_filepath else artifact[1] for artifact in artifacts]
+    representatives = dict()
+    for query_key, artifact in zip(query_keys, artifacts):
+        representatives.setdefault(query_key, artifact)
+    queries = list(representatives.items())
 
     # parallelize execution call for the text search
     log.info("Start parsing...")
     num_cores = multiprocessing.cpu_count()
-    csv_data = Parallel(n_jobs=num_cores - 1)(
-        delayed(__parse_execute)(commit, schema, ix, include_filepath) for commit in artifacts)
+    num_jobs = max(1, num_cores - 1)
+    # split the queries into a few chunks per job, so that the searcher is opened only once per chunk
+    # instead of once per query, while the jobs are still balanced
+    num_chunks = 4 * num_jobs
+    chunk_size = (len(queries) + num_chunks - 1) // num_chunks
+    chunks = [queries[i:i + chunk_size] for i in range(0, len(queries), max(1, chunk_size))]
+    csv_data = Parallel(n_jobs=num_jobs)(
+        delayed(__parse_execute)([artifact for (_, artifact) in chunk], schema, ix, include_filepath)
+        for chunk in chunks)
     log.info("Parsing finished.")
 
-    # re-arrange results
-    result = []
+    # collect the IDs of the matching messages per query
+    message_ids = dict()
+    for chunk, chunk_message_ids in zip(chunks, csv_data):
+        for (query_key, _), query_message_ids in zip(chunk, chunk_message_ids):
+            message_ids[query_key] = query_message_ids
+
+    # re-arrange results, expanding the results of each query to all artifacts with this query;
+    # the rows are constructed lazily while writing them to the output file
+    result = ((artifact[0], artifact[1], message_id)
+              for query_key, artifact in zip(query_keys, artifacts) for message_id in message_ids[query_key])
     if not append_result:
-        result.append(('file', 'artifact', 'messageID'))
-    for entry in csv_data:
-        for row in entry:
-            result.append(row)
+        result = itertools.chain([('file', 'artifact', 'messageID')], result)
 
     # determine ouput file
     filename = "mboxparsing"